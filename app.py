@@ -1,43 +1,51 @@
+import math
 import os
+import random
+import shutil
 import time
+import uuid
 
-from flask import Flask, render_template, request, url_for, jsonify
+from flask import Flask, render_template, request, url_for, jsonify, redirect
 from werkzeug.utils import secure_filename
-import pandas as pd
-from pydub import AudioSegment
-
-# ===== Let Python/Flask find ffmpeg.exe and ffprobe.exe =====
-# Use the ffmpeg-8.0.1-essentials_build/bin folder which has both executables
-ffmpeg_bin_path = os.path.join(os.path.abspath("."), "ffmpeg-8.0.1-essentials_build", "bin")
-os.environ["PATH"] += os.pathsep + ffmpeg_bin_path
-os.environ["PATH"] += os.pathsep + os.path.abspath(".")
 
 # ===== Your modules =====
 from modules.image_tool import allowed_file, apply_edit
 from modules.data_visualization import generate_sales_wave_art
+from modules.sales_rollups import query_series
 from modules.generative_art.art1_geometric import generate_geometric_storm
 from modules.generative_art.art2_oop_shapes import generate_oop_art
+from modules.generative_art import poster_queue
 from modules.audio_tool import (
-    allowed_audio, change_speed, add_echo, add_reverb,
-    pitch_shift_file, generate_ambient
+    allowed_audio, add_echo, add_reverb, change_speed_file,
+    pitch_shift_file, generate_ambient, load_segment
 )
-
-app = Flask(__name__)
+from modules.audio_speed import SPEED_MODES, MIN_SPEED, MAX_SPEED
+from modules.audio_decode import decode_stats
 
 # ---------------- PATHS / FOLDERS (centralized) ----------------
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-STATIC_DIR = os.path.join(BASE_DIR, "static")
+# Overridable so load tests / staging can write into a scratch folder
+STATIC_DIR = os.environ.get("STUDIO_STATIC_DIR", os.path.join(BASE_DIR, "static"))
 GEN_DIR = os.path.join(STATIC_DIR, "generated")
+TILES_DIR = os.path.join(GEN_DIR, "tiles")
 UPLOAD_DIR = os.path.join(STATIC_DIR, "uploads")
 OUTPUT_DIR = os.path.join(STATIC_DIR, "outputs")
 
 AUDIO_UPLOAD_DIR = os.path.join(STATIC_DIR, "audio_uploads")
 AUDIO_OUTPUT_DIR = os.path.join(STATIC_DIR, "audio_outputs")
 
-for d in [STATIC_DIR, GEN_DIR, UPLOAD_DIR, OUTPUT_DIR, AUDIO_UPLOAD_DIR, AUDIO_OUTPUT_DIR]:
+for d in [STATIC_DIR, GEN_DIR, TILES_DIR, UPLOAD_DIR, OUTPUT_DIR, AUDIO_UPLOAD_DIR, AUDIO_OUTPUT_DIR]:
     os.makedirs(d, exist_ok=True)
 
+app = Flask(__name__, static_folder=STATIC_DIR)
+
+SALES_CSV = "data/warehouse_sales.csv"
+
+# Previews regenerated on every page view are unique per request (safe across
+# workers); only the newest few of each kind are kept
+GENERATED_KEEP = int(os.environ.get("GENERATED_KEEP", "20"))
+
 OUTPUT_FOLDERS = [
     ("generated", GEN_DIR),
     ("outputs", OUTPUT_DIR),
@@ -47,6 +55,30 @@ OUTPUT_FOLDERS = [
 ]
 
 
+def unique_stamp():
+    """Timestamp + pid + random suffix, so names never collide across workers/threads."""
+    return f"{int(time.time())}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+def prune_generated(prefix, keep=GENERATED_KEEP):
+    """Delete all but the `keep` newest GEN_DIR files named `<prefix>_*`."""
+    files = []
+    for f in os.listdir(GEN_DIR):
+        if f.startswith(prefix + "_"):
+            path = os.path.join(GEN_DIR, f)
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+    files.sort(reverse=True)
+    for _, path in files[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            # Another worker pruned it first
+            pass
+
+
 # ---------------- HOME ----------------
 @app.route("/")
 def index():
@@ -71,15 +103,19 @@ def generative():
         seed_raw = request.form.get("seed", "").strip()
         seed = int(seed_raw) if seed_raw else None
 
-    out_path = os.path.join(GEN_DIR, "art1.png")
+    out_name = f"art1_{unique_stamp()}.png"
+    out_path = os.path.join(GEN_DIR, out_name)
+    # Without a user seed, pick one here so "Render Poster" can redraw this exact preview
+    art_seed = seed if seed is not None else random.randrange(1_000_000)
     generate_geometric_storm(
         n_shapes=n_shapes,
         palette=palette,
-        seed=seed,
+        seed=art_seed,
         save_path=out_path,
     )
+    prune_generated("art1")
 
-    img_url = url_for("static", filename="generated/art1.png") + f"?v={int(time.time())}"
+    img_url = url_for("static", filename=f"generated/{out_name}") + f"?v={int(time.time())}"
 
     return render_template(
         "generative_art.html",
@@ -87,6 +123,7 @@ def generative():
         n_shapes=n_shapes,
         palette=palette,
         seed="" if seed is None else seed,
+        poster_seed=art_seed,
     )
 
 
@@ -102,15 +139,19 @@ def generative_oop():
         seed_raw = request.form.get("seed", "").strip()
         seed = int(seed_raw) if seed_raw else None
 
-    out_path = os.path.join(GEN_DIR, "art2.png")
+    out_name = f"art2_{unique_stamp()}.png"
+    out_path = os.path.join(GEN_DIR, out_name)
+    # Without a user seed, pick one here so "Render Poster" can redraw this exact preview
+    art_seed = seed if seed is not None else random.randrange(1_000_000)
     generate_oop_art(
         n_shapes=n_shapes,
         palette=palette,
-        seed=seed,
+        seed=art_seed,
         save_path=out_path,
     )
+    prune_generated("art2")
 
-    img_url = url_for("static", filename="generated/art2.png") + f"?v={int(time.time())}"
+    img_url = url_for("static", filename=f"generated/{out_name}") + f"?v={int(time.time())}"
 
     return render_template(
         "generative_oop.html",
@@ -118,9 +159,57 @@ def generative_oop():
         n_shapes=n_shapes,
         palette=palette,
         seed="" if seed is None else seed,
+        poster_seed=art_seed,
     )
 
 
+POSTER_SIZES = [4096, 8192, 20000]
+
+# Same range as the generative forms
+POSTER_MIN_SHAPES = 10
+POSTER_MAX_SHAPES = 2000
+
+
+def _poster_tiff_path(name):
+    return os.path.join(TILES_DIR, f"{name}.tif")
+
+
+@app.route("/generative/poster", methods=["POST"])
+def generative_poster():
+    """Poster-size render as a deep-zoom tile pyramid (shown in the gallery)."""
+    art = request.form.get("art", "storm")
+    if art not in ("storm", "oop"):
+        art = "storm"
+    n_shapes = int(request.form.get("n_shapes", 250))
+    n_shapes = min(max(n_shapes, POSTER_MIN_SHAPES), POSTER_MAX_SHAPES)
+    palette = request.form.get("palette", "sunset")
+    seed_raw = request.form.get("seed", "").strip()
+    seed = int(seed_raw) if seed_raw else None
+
+    size = int(request.form.get("size", POSTER_SIZES[0]) or POSTER_SIZES[0])
+    if size not in POSTER_SIZES:
+        size = POSTER_SIZES[0]
+
+    name = f"poster_{unique_stamp()}_{art}_{size}"
+    tiff_path = _poster_tiff_path(name) if request.form.get("tiff") else None
+
+    # Rendered by a separate runner process, not this web worker
+    try:
+        poster_queue.enqueue(
+            TILES_DIR,
+            name,
+            art=art,
+            n_shapes=n_shapes,
+            palette=palette,
+            seed=seed,
+            size=size,
+            tiff_path=tiff_path,
+        )
+    except poster_queue.PosterQueueFull:
+        return redirect(url_for("gallery", poster_busy=1))
+    return redirect(url_for("gallery"))
+
+
 @app.route("/generative/interactive")
 def generative_interactive():
     return render_template("generative_interactive.html")
@@ -129,49 +218,47 @@ def generative_interactive():
 # ---------------- MODULE 2 : DATA ART ----------------
 @app.route("/data-art")
 def data_art():
-    out_path = os.path.join(GEN_DIR, "data_art.png")
+    out_name = f"data_art_{unique_stamp()}.png"
+    out_path = os.path.join(GEN_DIR, out_name)
     generate_sales_wave_art(
-        csv_path="data/warehouse_sales.csv",
+        csv_path=SALES_CSV,
         save_path=out_path,
     )
-    img_url = url_for("static", filename="generated/data_art.png") + f"?v={int(time.time())}"
+    prune_generated("data_art")
+    img_url = url_for("static", filename=f"generated/{out_name}") + f"?v={int(time.time())}"
     return render_template("data_art.html", img_url=img_url)
 
 
 @app.route("/api/sales-series")
 def sales_series():
-    df = pd.read_csv("data/warehouse_sales.csv")
-
-    # Normalize column names to reduce CSV mismatch issues
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # Ensure required columns exist
-    required = {"YEAR", "MONTH", "RETAIL SALES", "WAREHOUSE SALES"}
-    missing = required - set(df.columns)
-    if missing:
-        return jsonify({"error": f"CSV is missing columns: {sorted(list(missing))}"}), 400
-
-    df["MONTH"] = df["MONTH"].astype(str).str.zfill(2)
-    df["DATE"] = pd.to_datetime(df["YEAR"].astype(str) + "-" + df["MONTH"] + "-01", errors="coerce")
-    df = df.dropna(subset=["DATE"])
-
-    monthly = (
-        df.groupby("DATE")[["RETAIL SALES", "WAREHOUSE SALES"]]
-        .sum()
-        .reset_index()
-        .sort_values("DATE")
-    )
-
-    values = (monthly["RETAIL SALES"] + monthly["WAREHOUSE SALES"]).tolist()
-    labels = monthly["DATE"].dt.strftime("%Y-%m").tolist()
-
-    if not values:
-        return jsonify({"labels": [], "values": [], "norm": []})
-
-    mn, mx = min(values), max(values)
-    norm = [(v - mn) / (mx - mn) if mx != mn else 0.5 for v in values]
+    """
+    Monthly sales series, answered from precomputed rollup tables.
+
+    Query params (all optional):
+      start, end    date range, e.g. 2019-01 / 2020-06 (end=2019 covers all of 2019)
+      points        target number of points, at least 2 (downsampled)
+      downsample    "lttb" (default) or "minmax"
+      resolution    "month" (default), "quarter" or "year"
+      group_by      "supplier" or "item_type" -> adds per-group "series"
+      top           number of groups returned with group_by (default 5, at least 1)
+    """
+    try:
+        points = request.args.get("points", type=int)
+        top = request.args.get("top", default=5, type=int)
+        data = query_series(
+            SALES_CSV,
+            start=request.args.get("start"),
+            end=request.args.get("end"),
+            points=points,
+            method=request.args.get("downsample", "lttb"),
+            group_by=request.args.get("group_by") or None,
+            top=top,
+            resolution=request.args.get("resolution", "month"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify({"labels": labels, "values": values, "norm": norm})
+    return jsonify(data)
 
 
 @app.route("/data-art/multi")
@@ -194,7 +281,7 @@ def image_tool():
             return render_template("image_tool.html", output_url=None)
 
         # Unique upload name to avoid overwriting
-        in_name = f"in_{int(time.time())}_{filename}"
+        in_name = f"in_{unique_stamp()}_{filename}"
         in_path = os.path.join(UPLOAD_DIR, in_name)
         f.save(in_path)
 
@@ -207,7 +294,7 @@ def image_tool():
         w = int(w_raw) if w_raw else None
         h = int(h_raw) if h_raw else None
 
-        out_name = f"edited_{int(time.time())}_{filename}"
+        out_name = f"edited_{unique_stamp()}_{filename}"
         out_path = os.path.join(OUTPUT_DIR, out_name)
 
         apply_edit(
@@ -226,6 +313,22 @@ def image_tool():
 
 
 # ---------------- MODULE 3B : AUDIO TOOL ----------------
+def _parse_speed_form(form):
+    """(speed, mode) from the speed form; ValueError with a user-facing message if invalid."""
+    raw = (form.get("speed") or "1").strip()
+    try:
+        speed = float(raw)
+    except ValueError:
+        speed = math.nan
+    if not math.isfinite(speed) or not MIN_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"Speed must be a number between {MIN_SPEED:g} and {MAX_SPEED:g} (got {raw!r}).")
+
+    mode = form.get("speed_mode") or "varispeed"
+    if mode not in SPEED_MODES:
+        raise ValueError(f"Unknown speed mode {mode!r} (expected one of {', '.join(SPEED_MODES)}).")
+    return speed, mode
+
+
 @app.route("/audio-tool", methods=["GET", "POST"])
 def audio_tool():
     output_url = None
@@ -235,7 +338,7 @@ def audio_tool():
 
         # Ambient generation (no upload)
         if action == "ambient":
-            out_name = f"ambient_{int(time.time())}.wav"
+            out_name = f"ambient_{unique_stamp()}.wav"
             out_path = os.path.join(AUDIO_OUTPUT_DIR, out_name)
             generate_ambient(out_path)
             output_url = url_for("static", filename=f"audio_outputs/{out_name}") + f"?v={int(time.time())}"
@@ -249,33 +352,45 @@ def audio_tool():
         if not allowed_audio(name):
             return render_template("audio_tool.html", output_url=None)
 
-        in_name = f"in_{int(time.time())}_{name}"
+        # Validate before anything is written to disk
+        if action == "speed":
+            try:
+                speed, mode = _parse_speed_form(request.form)
+            except ValueError as e:
+                return render_template("audio_tool.html", output_url=None, error=str(e)), 400
+
+        in_name = f"in_{unique_stamp()}_{name}"
         in_path = os.path.join(AUDIO_UPLOAD_DIR, in_name)
         f.save(in_path)
 
         # Pitch shifting (librosa) -> outputs wav
         if action == "pitch":
             semis = float(request.form.get("semitones", "0") or 0)
-            out_name = f"pitch_{int(time.time())}.wav"
+            out_name = f"pitch_{unique_stamp()}.wav"
             out_path = os.path.join(AUDIO_OUTPUT_DIR, out_name)
             pitch_shift_file(in_path, out_path, semis)
             output_url = url_for("static", filename=f"audio_outputs/{out_name}") + f"?v={int(time.time())}"
             return render_template("audio_tool.html", output_url=output_url)
 
-        # PyDub effects
-        seg = AudioSegment.from_file(in_path)
-
+        # Speed (NumPy/SciPy engine) -> outputs wav
         if action == "speed":
-            speed = float(request.form.get("speed", "1") or 1)
-            seg2 = change_speed(seg, speed)
-        elif action == "echo":
+            out_name = f"speed_{unique_stamp()}.wav"
+            out_path = os.path.join(AUDIO_OUTPUT_DIR, out_name)
+            change_speed_file(in_path, out_path, speed, mode=mode)
+            output_url = url_for("static", filename=f"audio_outputs/{out_name}") + f"?v={int(time.time())}"
+            return render_template("audio_tool.html", output_url=output_url)
+
+        # PyDub effects (decoded in-process, ffmpeg only for mp3/m4a)
+        seg = load_segment(in_path)
+
+        if action == "echo":
             seg2 = add_echo(seg)
         elif action == "reverb":
             seg2 = add_reverb(seg)
         else:
             seg2 = seg
 
-        out_name = f"{action}_{int(time.time())}.wav"
+        out_name = f"{action}_{unique_stamp()}.wav"
         out_path = os.path.join(AUDIO_OUTPUT_DIR, out_name)
         seg2.export(out_path, format="wav")
 
@@ -284,6 +399,12 @@ def audio_tool():
     return render_template("audio_tool.html", output_url=output_url)
 
 
+@app.route("/api/audio-decode-stats")
+def audio_decode_stats():
+    # Counters are per process: under gunicorn this is the answering worker's share
+    return jsonify(decode_stats())
+
+
 # ---------------- GALLERY ----------------
 @app.route("/gallery")
 def gallery():
@@ -304,7 +425,33 @@ def gallery():
     # Newest first (works well with timestamped names)
     items.sort(key=lambda x: x["filename"], reverse=True)
 
-    return render_template("gallery.html", items=items)
+    # Drop leftovers of a crashed poster runner, restart a stalled queue
+    poster_queue.check_queue(TILES_DIR)
+    rendering = [
+        name if job.get("state") == "running" else f"{name} (queued)"
+        for name, job in poster_queue.list_jobs(TILES_DIR)
+    ]
+
+    # Deep-zoom posters: the viewer loads tiles on demand, never the full image
+    posters = []
+    for f in sorted(os.listdir(TILES_DIR), reverse=True):
+        if f.endswith(".dzi"):
+            name = f[:-len(".dzi")]
+            tiff = name + ".tif"
+            posters.append({
+                "filename": name,
+                "dzi_url": url_for("static", filename=f"generated/tiles/{f}"),
+                "tiff_url": url_for("static", filename=f"generated/tiles/{tiff}")
+                if os.path.exists(os.path.join(TILES_DIR, tiff)) else None,
+            })
+
+    return render_template(
+        "gallery.html",
+        items=items,
+        posters=posters,
+        rendering=rendering,
+        poster_busy=request.args.get("poster_busy") == "1",
+    )
 
 
 @app.route("/gallery/clear", methods=["POST"])
@@ -321,7 +468,27 @@ def gallery_clear():
                         deleted_count += 1
                 except Exception as e:
                     pass
-    
+
+    # Poster tile pyramids are folders of tiles; count each poster once.
+    # Posters still rendering are left alone.
+    # One listing for both passes: a poster started after it isn't in it at all
+    listing = os.listdir(TILES_DIR)
+    active = tuple(f[:-len(".rendering")] for f in listing if f.endswith(".rendering"))
+    for f in listing:
+        path = os.path.join(TILES_DIR, f)
+        # Dotfiles are the poster runner's lock/log/temp files
+        if f.startswith(".") or (active and f.startswith(active)):
+            continue
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError:
+            continue
+        if f.endswith(".dzi"):
+            deleted_count += 1
+
     return jsonify({"ok": True, "deleted": deleted_count})
 
 
@@ -334,7 +501,7 @@ def upload():
         if f and f.filename:
             filename = secure_filename(f.filename)
             # Make it unique to avoid overwrites
-            safe_name = f"in_{int(time.time())}_{filename}"
+            safe_name = f"in_{unique_stamp()}_{filename}"
             f.save(os.path.join(UPLOAD_DIR, safe_name))
             filename = safe_name
 
@@ -354,7 +521,7 @@ def save_canvas():
         b64 = img_data.split(",", 1)[1]
         raw = base64.b64decode(b64)
 
-        filename = f"canvas_{int(time.time())}.png"
+        filename = f"canvas_{unique_stamp()}.png"
         out_path = os.path.join(GEN_DIR, filename)
 
         with open(out_path, "wb") as f:
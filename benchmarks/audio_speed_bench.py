@@ -0,0 +1,63 @@
+"""
+Speed engine benchmark: legacy PyDub path vs NumPy/SciPy engine.
+
+Run from the project root:
+    python -m benchmarks.audio_speed_bench
+    python -m benchmarks.audio_speed_bench --seconds 60 --channels 2 --sr 44100
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules.audio_tool import change_speed, samples_to_segment
+from modules.audio_speed import varispeed, time_stretch
+
+
+def _test_signal(seconds, sr, channels, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    chans = [
+        0.3 * np.sin(2 * np.pi * (110 * (c + 1)) * t) + 0.02 * rng.standard_normal(len(t))
+        for c in range(channels)
+    ]
+    return np.stack(chans, axis=1).astype(np.float32)
+
+
+def _best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--speeds", type=float, nargs="+", default=[0.8, 1.25, 1.5])
+    args = parser.parse_args()
+
+    y = _test_signal(args.seconds, args.sr, args.channels)
+    seg = samples_to_segment(y, args.sr)
+
+    engines = [
+        ("pydub (legacy)", lambda s: change_speed(seg, s)),
+        ("varispeed", lambda s: varispeed(y, s)),
+        ("stretch", lambda s: time_stretch(y, s)),
+    ]
+
+    print(f"{args.seconds:g}s of audio, {args.channels} ch @ {args.sr} Hz, best of {args.repeats}")
+    print(f"{'engine':<16}{'speed':>7}{'time (s)':>11}{'x realtime':>13}")
+    for name, fn in engines:
+        for speed in args.speeds:
+            elapsed = _best_of(lambda: fn(speed), args.repeats)
+            print(f"{name:<16}{speed:>7.2f}{elapsed:>11.3f}{args.seconds / elapsed:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Local load test: mixed workload across all routes, p50/p99 latency and throughput.
+
+Start gunicorn with 1, 2 and 4 workers in turn and drive each one:
+    python -m benchmarks.load_test --workers 1 2 4 --duration 30 --concurrency 8
+
+Or hit a server that is already running (its gallery fills up with outputs):
+    python -m benchmarks.load_test --url http://127.0.0.1:5000
+
+Each gunicorn run writes into a fresh temporary STUDIO_STATIC_DIR that is
+deleted afterwards, so runs don't touch static/ or slow each other down.
+
+Routes left out of the workload:
+  - /generative/poster: minutes of CPU per request; opt in with --with-poster
+    (smallest size, few shapes)
+  - /gallery/clear: destructive, would empty the gallery mid-run
+  - /upload: its template (upload.html) doesn't exist
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import wave
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+
+def _tiny_png(size=64):
+    """A small RGB gradient PNG, built with the stdlib only."""
+    # Each scanline starts with filter type 0
+    rows = b"".join(
+        b"\x00" + b"".join(bytes((x * 4 % 256, y * 4 % 256, 128)) for x in range(size))
+        for y in range(size)
+    )
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    ihdr = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def _tiny_wav(seconds=2.0, sr=22050):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        frames = (int(12000 * math.sin(2 * math.pi * 220 * i / sr)) for i in range(int(seconds * sr)))
+        w.writeframes(b"".join(struct.pack("<h", v) for v in frames))
+    return buf.getvalue()
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for k, v in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode())
+    for k, (filename, data, ctype) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"; filename="{filename}"\r\n'
+            f"Content-Type: {ctype}\r\n\r\n".encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_workload(with_poster=False):
+    """[(name, weight, method, path, body, content_type)]"""
+    png, wav = _tiny_png(), _tiny_wav()
+    form = "application/x-www-form-urlencoded"
+    img_body, img_ct = _multipart({"effect": "blur", "rotate": "90"}, {"image": ("load.png", png, "image/png")})
+    speed_body, speed_ct = _multipart({"action": "speed", "speed": "1.25", "speed_mode": "stretch"},
+                                      {"audio": ("load.wav", wav, "audio/wav")})
+    echo_body, echo_ct = _multipart({"action": "echo"}, {"audio": ("load.wav", wav, "audio/wav")})
+    pitch_body, pitch_ct = _multipart({"action": "pitch", "semitones": "2"},
+                                      {"audio": ("load.wav", wav, "audio/wav")})
+    canvas_body = json.dumps({"image": "data:image/png;base64," + base64.b64encode(png).decode()}).encode()
+
+    workload = [
+        ("home", 10, "GET", "/", None, None),
+        ("mobile", 3, "GET", "/mobile", None, None),
+        ("generative", 6, "GET", "/generative", None, None),
+        ("generative POST", 6, "POST", "/generative", b"n_shapes=250&palette=ocean&seed=", form),
+        ("generative/oop", 6, "GET", "/generative/oop", None, None),
+        ("generative/oop POST", 4, "POST", "/generative/oop", b"n_shapes=180&palette=sunset&seed=", form),
+        ("generative/interactive", 3, "GET", "/generative/interactive", None, None),
+        ("data-art", 4, "GET", "/data-art", None, None),
+        ("data-art/multi", 3, "GET", "/data-art/multi", None, None),
+        ("data-art/animated", 3, "GET", "/data-art/animated", None, None),
+        ("api/sales-series", 10, "GET", "/api/sales-series?points=200", None, None),
+        ("api/sales-series group", 5, "GET", "/api/sales-series?group_by=supplier&resolution=quarter", None, None),
+        ("image-tool POST", 5, "POST", "/image-tool", img_body, img_ct),
+        ("audio speed POST", 4, "POST", "/audio-tool", speed_body, speed_ct),
+        ("audio echo POST", 3, "POST", "/audio-tool", echo_body, echo_ct),
+        ("audio pitch POST", 3, "POST", "/audio-tool", pitch_body, pitch_ct),
+        ("audio ambient POST", 3, "POST", "/audio-tool", b"action=ambient", form),
+        ("api/audio-decode-stats", 2, "GET", "/api/audio-decode-stats", None, None),
+        ("save_canvas", 3, "POST", "/save_canvas", canvas_body, "application/json"),
+        ("gallery", 4, "GET", "/gallery", None, None),
+    ]
+    if with_poster:
+        workload.append(("generative/poster", 1, "POST", "/generative/poster",
+                         b"art=storm&size=4096&n_shapes=50&seed=1", form))
+    return workload
+
+
+def _request(base_url, method, path, body, ctype, timeout):
+    req = urllib.request.Request(base_url + path, data=body, method=method)
+    if ctype:
+        req.add_header("Content-Type", ctype)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def run_load(base_url, duration, concurrency, timeout=120, seed=0, with_poster=False):
+    """Drive the weighted workload for `duration` seconds; returns per-request samples."""
+    workload = build_workload(with_poster)
+    weights = [w for _, w, *_ in workload]
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(cid):
+        rng = random.Random(seed + cid)
+        while time.perf_counter() < deadline:
+            name, _, method, path, body, ctype = rng.choices(workload, weights)[0]
+            status, elapsed = _request(base_url, method, path, body, ctype, timeout)
+            with lock:
+                samples.append((name, status, elapsed))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def _percentiles(latencies):
+    if len(latencies) < 2:
+        v = latencies[0] if latencies else float("nan")
+        return v, v
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return q[49], q[98]
+
+
+def report(label, samples, wall):
+    ok = [s for s in samples if 200 <= s[1] < 400]
+    p50, p99 = _percentiles([s[2] for s in ok])
+    print(f"\n== {label}: {len(samples)} requests, {len(samples) - len(ok)} errors, "
+          f"{len(ok) / wall:.1f} req/s, p50 {p50 * 1000:.0f} ms, p99 {p99 * 1000:.0f} ms")
+    print(f"  {'route':<26}{'n':>6}{'err':>6}{'p50 ms':>10}{'p99 ms':>10}")
+    for name in sorted({s[0] for s in samples}):
+        rows = [s for s in samples if s[0] == name]
+        good = [s[2] for s in rows if 200 <= s[1] < 400]
+        r50, r99 = _percentiles(good)
+        print(f"  {name:<26}{len(rows):>6}{len(rows) - len(good):>6}{r50 * 1000:>10.0f}{r99 * 1000:>10.0f}")
+    return {"requests": len(samples), "errors": len(samples) - len(ok),
+            "rps": len(ok) / wall, "p50": p50, "p99": p99}
+
+
+def _wait_ready(base_url, proc, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        status, _ = _request(base_url, "GET", "/", None, None, 5)
+        if status == 200:
+            return
+        time.sleep(0.5)
+    raise RuntimeError("gunicorn did not become ready in time")
+
+
+def _wait_posters(static_dir, timeout):
+    """Posters outlive gunicorn (detached runner): let them finish before cleanup."""
+    tiles = os.path.join(static_dir, "generated", "tiles")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not os.path.isdir(tiles) or not any(f.endswith(".rendering") for f in os.listdir(tiles)):
+            return
+        time.sleep(1)
+
+
+def run_with_gunicorn(n_workers, port, args):
+    base_url = f"http://127.0.0.1:{port}"
+    cmd = [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+        "-w", str(n_workers), "-b", f"127.0.0.1:{port}",
+        "--access-logfile", os.devnull, "wsgi:app",
+    ]
+    static_dir = tempfile.mkdtemp(prefix="studio_load_")
+    env = dict(os.environ, STUDIO_STATIC_DIR=static_dir)
+    proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(base_url, proc, args.startup_timeout)
+        samples, wall = run_load(base_url, args.duration, args.concurrency, args.timeout,
+                                 with_poster=args.with_poster)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        if args.with_poster:
+            _wait_posters(static_dir, args.startup_timeout)
+        shutil.rmtree(static_dir, ignore_errors=True)
+    return samples, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="test an already-running server instead of starting gunicorn")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--with-poster", action="store_true", help="also POST small /generative/poster renders")
+    args = parser.parse_args()
+
+    if args.url:
+        print(f"note: outputs are written into {args.url}'s own static folders")
+        samples, wall = run_load(args.url.rstrip("/"), args.duration, args.concurrency, args.timeout,
+                                 with_poster=args.with_poster)
+        report(args.url, samples, wall)
+        return
+
+    summary = []
+    for n in args.workers:
+        samples, wall = run_with_gunicorn(n, args.port, args)
+        summary.append((n, report(f"{n} worker(s)", samples, wall)))
+
+    print(f"\n{'workers':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for n, r in summary:
+        print(f"{n:>8}{r['rps']:>9.1f}{r['p50'] * 1000:>9.0f}{r['p99'] * 1000:>9.0f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
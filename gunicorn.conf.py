@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for production serving:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Everything can be overridden with environment variables or CLI flags
+(e.g. `gunicorn -c gunicorn.conf.py -w 8 wsgi:app`).
+"""
+import multiprocessing
+import os
+import random
+
+# Run from the project root so relative paths like data/ resolve
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+
+# Rendering is CPU-bound: one sync worker per core
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+worker_class = "sync"
+
+# Import the app and run the warmup once in the master, then fork
+preload_app = True
+
+# Posters render in a separate queue runner, so requests stay short; this
+# only has to cover the slowest audio effects on long uploads
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# Recycle workers now and then (matplotlib/librosa hold on to memory)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "500"))
+max_requests_jitter = 50
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Forked workers inherit the master's RNG state; reseed so unseeded
+    # artworks differ between workers
+    import numpy as np
+
+    random.seed()
+    np.random.seed()
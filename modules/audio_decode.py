@@ -0,0 +1,189 @@
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+# Get absolute path to project root
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+# Optional bundled build (Windows zip layout); system installs are found on PATH
+BUNDLED_FFMPEG_BIN = os.path.join(PROJECT_ROOT, "ffmpeg-8.0.1-essentials_build", "bin")
+
+# Formats libsndfile decodes in-process, no subprocess needed
+SOUNDFILE_FORMATS = {".wav", ".flac", ".ogg"}
+
+# Max number of ffmpeg decoders running at once
+FFMPEG_POOL_SIZE = int(os.environ.get("FFMPEG_POOL_SIZE", "2"))
+
+
+def find_binary(name):
+    """
+    Locate an ffmpeg-family executable ("ffmpeg" / "ffprobe").
+    Order: FFMPEG_BINARY / FFPROBE_BINARY env var, bundled build folder,
+    project root, then the system PATH. Returns None if nothing is found.
+    """
+    env_path = os.environ.get(f"{name.upper()}_BINARY")
+    if env_path and os.path.isfile(env_path):
+        return env_path
+
+    exe = name + ".exe" if sys.platform.startswith("win") else name
+    for folder in (BUNDLED_FFMPEG_BIN, PROJECT_ROOT):
+        candidate = os.path.join(folder, exe)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+
+    return shutil.which(name)
+
+
+FFMPEG_PATH = find_binary("ffmpeg")
+FFPROBE_PATH = find_binary("ffprobe")
+
+
+class DecodeStats:
+    """
+    Thread-safe per-format counters for decode throughput.
+    Counters live in process memory: under gunicorn every worker has its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, ext, backend, frames, sr, channels, elapsed):
+        with self._lock:
+            s = self._data.setdefault(ext, {
+                "backend": backend,
+                "files": 0,
+                "audio_seconds": 0.0,
+                "decode_seconds": 0.0,
+                "bytes": 0,
+            })
+            s["backend"] = backend
+            s["files"] += 1
+            s["audio_seconds"] += frames / float(sr) if sr else 0.0
+            s["decode_seconds"] += elapsed
+            s["bytes"] += frames * channels * 4
+
+    def snapshot(self):
+        """Totals plus derived throughput (x realtime and MB/s of float32 PCM)."""
+        with self._lock:
+            out = {}
+            for ext, s in self._data.items():
+                t = s["decode_seconds"] or 1e-9
+                out[ext] = dict(
+                    s,
+                    realtime_factor=round(s["audio_seconds"] / t, 2),
+                    mb_per_s=round(s["bytes"] / t / 1e6, 2),
+                )
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+STATS = DecodeStats()
+
+
+class FFmpegPool:
+    """
+    Bounded pool of ffmpeg decoders.
+    Each decode streams float32 PCM straight from ffmpeg's stdout into memory
+    (no temp files, no separate ffprobe call); the semaphore caps how many
+    ffmpeg processes a worker can have alive at once.
+    """
+
+    def __init__(self, ffmpeg_path, size=FFMPEG_POOL_SIZE):
+        self.ffmpeg_path = ffmpeg_path
+        self._slots = threading.BoundedSemaphore(max(1, size))
+
+    def decode(self, path):
+        if not self.ffmpeg_path:
+            raise RuntimeError(
+                "ffmpeg was not found. Install it (e.g. 'apt install ffmpeg') "
+                "or set FFMPEG_BINARY to its full path."
+            )
+
+        cmd = [
+            self.ffmpeg_path, "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-i", path,
+            "-vn", "-acodec", "pcm_f32le", "-f", "wav", "-",
+        ]
+        with self._slots:
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        if proc.returncode != 0:
+            msg = proc.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(f"ffmpeg failed to decode {os.path.basename(path)}: {msg}")
+
+        return _parse_piped_wav(proc.stdout)
+
+
+def _parse_piped_wav(raw):
+    """
+    Parse the float32 WAV that ffmpeg writes to a pipe.
+    ffmpeg can't seek back to fill in chunk sizes on a pipe, so the RIFF/data
+    sizes are placeholders: read the fmt chunk, then take everything after the
+    data header as samples.
+    """
+    if raw[:4] != b"RIFF" or raw[8:12] != b"WAVE":
+        raise RuntimeError("ffmpeg did not return WAV data")
+
+    pos = 12
+    channels = sr = None
+    while pos + 8 <= len(raw):
+        chunk_id = raw[pos:pos + 4]
+        size = struct.unpack("<I", raw[pos + 4:pos + 8])[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            channels, sr = struct.unpack("<HI", raw[body + 2:body + 8])
+        elif chunk_id == b"data":
+            if channels is None:
+                break
+            # Slice through a memoryview so the PCM is never copied
+            data = memoryview(raw)[body:]
+            usable = len(data) - len(data) % (4 * channels)
+            y = np.frombuffer(data[:usable], dtype="<f4").reshape(-1, channels)
+            return y.astype(np.float32, copy=False), sr
+        pos = body + size + (size & 1)
+
+    raise RuntimeError("ffmpeg WAV output has no fmt/data chunk")
+
+
+POOL = FFmpegPool(FFMPEG_PATH)
+
+
+def decode_file(path):
+    """
+    Decode an audio file to a float32 array of shape (frames, channels).
+    wav/flac/ogg are decoded in-process with soundfile; everything else
+    (mp3, m4a, ...) goes through the ffmpeg pool.
+    Returns (samples, sample_rate).
+    """
+    ext = os.path.splitext(path.lower())[1]
+    start = time.perf_counter()
+
+    backend = "soundfile"
+    if ext in SOUNDFILE_FORMATS:
+        try:
+            y, sr = sf.read(path, dtype="float32", always_2d=True)
+        except RuntimeError:
+            # Odd encodings libsndfile rejects (e.g. some WAV codecs)
+            backend = "ffmpeg"
+            y, sr = POOL.decode(path)
+    else:
+        backend = "ffmpeg"
+        y, sr = POOL.decode(path)
+
+    STATS.record(ext, backend, y.shape[0], sr, y.shape[1], time.perf_counter() - start)
+    return y, sr
+
+
+def decode_stats():
+    return STATS.snapshot()
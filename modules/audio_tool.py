@@ -5,24 +5,18 @@ from pydub.effects import normalize
 import soundfile as sf
 import librosa
 
-# Get absolute path to project root
-PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+from modules.audio_decode import FFMPEG_PATH, FFPROBE_PATH, decode_file
+from modules.audio_speed import change_speed_array
 
-# Use ffmpeg-8.0.1-essentials_build/bin folder which has both executables
-FFMPEG_BIN = os.path.join(PROJECT_ROOT, "ffmpeg-8.0.1-essentials_build", "bin")
-FFMPEG_PATH = os.path.join(FFMPEG_BIN, "ffmpeg.exe")
-FFPROBE_PATH = os.path.join(FFMPEG_BIN, "ffprobe.exe")
-
-# Tell PyDub where ffmpeg and ffprobe are located (full paths)
-AudioSegment.converter = FFMPEG_PATH  
-AudioSegment.ffmpeg = FFMPEG_PATH  
-AudioSegment.ffprobe = FFPROBE_PATH  
-
-# Also add to PATH for other libraries that might need it  
-os.environ["PATH"] += os.pathsep + FFMPEG_BIN  
-os.environ["PATH"] += os.pathsep + PROJECT_ROOT
-os.environ["FFMPEG_BINARY"] = FFMPEG_PATH  
-os.environ["FFPROBE_BINARY"] = FFPROBE_PATH 
+# Tell PyDub where ffmpeg and ffprobe are located (only used for mp3/m4a export
+# and as a last resort; decoding goes through modules.audio_decode)
+if FFMPEG_PATH:
+    AudioSegment.converter = FFMPEG_PATH
+    AudioSegment.ffmpeg = FFMPEG_PATH
+    os.environ["FFMPEG_BINARY"] = FFMPEG_PATH
+if FFPROBE_PATH:
+    AudioSegment.ffprobe = FFPROBE_PATH
+    os.environ["FFPROBE_BINARY"] = FFPROBE_PATH
 
 ALLOWED_AUDIO = {".wav", ".mp3", ".ogg", ".flac", ".m4a"}
 
@@ -30,11 +24,38 @@ def allowed_audio(filename: str) -> bool:
     _, ext = os.path.splitext(filename.lower())
     return ext in ALLOWED_AUDIO
 
+def samples_to_segment(y, sr):
+    """Wrap a float32 (frames, channels) array as a 16-bit PyDub segment."""
+    pcm = (np.clip(y, -1.0, 1.0) * 32767.0).astype("<i2")
+    return AudioSegment(
+        data=pcm.tobytes(),
+        sample_width=2,
+        frame_rate=int(sr),
+        channels=pcm.shape[1],
+    )
+
+def load_segment(path):
+    """Decode with modules.audio_decode instead of AudioSegment.from_file."""
+    y, sr = decode_file(path)
+    return samples_to_segment(y, sr)
+
 def change_speed(seg, speed):
+    """Legacy PyDub path (frame-rate relabel + naive resample); kept for benchmarks."""
     new_rate = int(seg.frame_rate * speed)
     s = seg._spawn(seg.raw_data, overrides={"frame_rate": new_rate})
     return s.set_frame_rate(seg.frame_rate)
 
+def change_speed_file(input_path, output_path, speed, mode="varispeed"):
+    """
+    Speed change on float32 arrays.
+    mode="varispeed": polyphase resample, pitch follows tempo.
+    mode="stretch": phase-vocoder time-stretch, pitch unchanged.
+    """
+    y, sr = decode_file(input_path)
+    y2 = change_speed_array(y, speed, mode=mode)
+    sf.write(output_path, np.clip(y2, -1.0, 1.0), sr)
+    return output_path
+
 def add_echo(seg, delay_ms=180, repeats=4):
     out = seg
     for i in range(1, repeats + 1):
@@ -54,9 +75,8 @@ def layer_two(seg1, seg2, gain2_db=-6):
 
 def pitch_shift_file(input_path, output_path, semitones):
     """Apply pitch shift to audio file using librosa with keyword arguments."""
-    y, sr = sf.read(input_path)
-    if y.ndim > 1:
-        y = y.mean(axis=1)
+    y, sr = decode_file(input_path)
+    y = y.mean(axis=1)
     # Use keyword arguments for librosa 0.10+
     y2 = librosa.effects.pitch_shift(y=y.astype(float), sr=sr, n_steps=semitones)
     sf.write(output_path, y2, sr)
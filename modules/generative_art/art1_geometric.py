@@ -8,24 +8,43 @@ PALETTES = {
     "mono":   ["#111111", "#333333", "#555555", "#777777", "#999999"],
 }
 
-def generate_geometric_storm(
-    n_shapes=250,
-    palette="sunset",
-    seed=None,
-    save_path="static/generated/art1.png",
-    background="#ffffff",
-):
+class StormLine:
+    def __init__(self, x, y, x2, y2, linewidth, alpha, color):
+        self.x, self.y, self.x2, self.y2 = x, y, x2, y2
+        self.linewidth = linewidth
+        self.alpha = alpha
+        self.color = color
+
+    def bbox(self):
+        return (min(self.x, self.x2), min(self.y, self.y2),
+                max(self.x, self.x2), max(self.y, self.y2))
+
+    def draw(self, ax, lw_scale=1.0):
+        ax.plot([self.x, self.x2], [self.y, self.y2],
+                linewidth=self.linewidth * lw_scale, alpha=self.alpha, color=self.color)
+
+
+class StormCircle:
+    def __init__(self, x, y, r, alpha, color):
+        self.x, self.y, self.r = x, y, r
+        self.alpha = alpha
+        self.color = color
+
+    def bbox(self):
+        return (self.x - self.r, self.y - self.r, self.x + self.r, self.y + self.r)
+
+    def draw(self, ax, lw_scale=1.0):
+        ax.add_patch(plt.Circle((self.x, self.y), self.r, color=self.color,
+                                alpha=self.alpha, linewidth=lw_scale))
+
+
+def build_storm_shapes(n_shapes=250, palette="sunset", seed=None):
+    """Shape list for the geometric storm, in draw order (0..100 world units)."""
     if seed is not None:
         random.seed(seed)
 
     colors = PALETTES.get(palette, PALETTES["sunset"])
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-    fig, ax = plt.subplots(figsize=(7, 7))
-    ax.set_facecolor(background)
-    ax.set_xlim(0, 100)
-    ax.set_ylim(0, 100)
-    ax.axis("off")
+    shapes = []
 
     for i in range(n_shapes):
         x, y = random.uniform(0, 100), random.uniform(0, 100)
@@ -37,10 +56,32 @@ def generate_geometric_storm(
             y2 = y + random.uniform(-15, 15)
             lw = random.uniform(0.3, 2.5)
             alpha = random.uniform(0.2, 0.8)
-            ax.plot([x, x2], [y, y2], linewidth=lw, alpha=alpha, color=c)
+            shapes.append(StormLine(x, y, x2, y2, lw, alpha, c))
         else:
             alpha = 0.15 if r > 4 else random.uniform(0.2, 0.9)
-            ax.add_patch(plt.Circle((x, y), r, color=c, alpha=alpha))
+            shapes.append(StormCircle(x, y, r, alpha, c))
+
+    return shapes
+
+
+def generate_geometric_storm(
+    n_shapes=250,
+    palette="sunset",
+    seed=None,
+    save_path="static/generated/art1.png",
+    background="#ffffff",
+):
+    shapes = build_storm_shapes(n_shapes=n_shapes, palette=palette, seed=seed)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+
+    fig, ax = plt.subplots(figsize=(7, 7))
+    ax.set_facecolor(background)
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 100)
+    ax.axis("off")
+
+    for shp in shapes:
+        shp.draw(ax)
 
     plt.tight_layout()
     fig.savefig(save_path, dpi=200)
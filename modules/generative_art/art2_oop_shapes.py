@@ -25,55 +25,44 @@ class Shape:
     def recolor(self, new_color):
         self.color = new_color
 
-    def draw(self, ax):
+    def bbox(self):
+        return (self.x - self.size, self.y - self.size, self.x + self.size, self.y + self.size)
+
+    def draw(self, ax, lw_scale=1.0):
         raise NotImplementedError
 
 
 class Circle(Shape):
-    def draw(self, ax):
-        ax.add_patch(plt.Circle((self.x, self.y), self.size, color=self.color, alpha=self.alpha))
+    def draw(self, ax, lw_scale=1.0):
+        ax.add_patch(plt.Circle((self.x, self.y), self.size, color=self.color, alpha=self.alpha,
+                                linewidth=lw_scale))
 
 
 class Square(Shape):
-    def draw(self, ax):
+    def draw(self, ax, lw_scale=1.0):
         s = self.size * 2
         ax.add_patch(plt.Rectangle((self.x - self.size, self.y - self.size), s, s,
-                                   color=self.color, alpha=self.alpha))
+                                   color=self.color, alpha=self.alpha, linewidth=lw_scale))
 
 
 class Triangle(Shape):
-    def draw(self, ax):
+    def draw(self, ax, lw_scale=1.0):
         s = self.size * 2
         points = [
             (self.x, self.y + self.size),
             (self.x - self.size, self.y - self.size),
             (self.x + self.size, self.y - self.size),
         ]
-        ax.add_patch(plt.Polygon(points, closed=True, color=self.color, alpha=self.alpha))
+        ax.add_patch(plt.Polygon(points, closed=True, color=self.color, alpha=self.alpha,
+                                 linewidth=lw_scale))
 
 
-def generate_oop_art(
-    n_shapes=180,
-    palette="ocean",
-    seed=None,
-    save_path="static/generated/art2.png",
-    background="#ffffff",
-):
-    """
-    Artwork 2: Object-Oriented generative art using Shape classes.
-    """
+def build_oop_shapes(n_shapes=180, palette="ocean", seed=None):
+    """Shape objects for Artwork 2, in draw order (0..100 world units)."""
     if seed is not None:
         random.seed(seed)
 
     colors = PALETTES.get(palette, PALETTES["ocean"])
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-    fig, ax = plt.subplots(figsize=(7, 7))
-    ax.set_facecolor(background)
-    ax.set_xlim(0, 100)
-    ax.set_ylim(0, 100)
-    ax.axis("off")
-
     shape_classes = [Circle, Square, Triangle]
     shapes = []
 
@@ -96,6 +85,28 @@ def generate_oop_art(
 
         shapes.append(shp)
 
+    return shapes
+
+
+def generate_oop_art(
+    n_shapes=180,
+    palette="ocean",
+    seed=None,
+    save_path="static/generated/art2.png",
+    background="#ffffff",
+):
+    """
+    Artwork 2: Object-Oriented generative art using Shape classes.
+    """
+    shapes = build_oop_shapes(n_shapes=n_shapes, palette=palette, seed=seed)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+
+    fig, ax = plt.subplots(figsize=(7, 7))
+    ax.set_facecolor(background)
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 100)
+    ax.axis("off")
+
     for shp in shapes:
         shp.draw(ax)
 
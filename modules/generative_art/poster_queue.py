@@ -0,0 +1,173 @@
+"""
+Poster render queue, run outside the web server processes.
+
+The web app writes a "<name>.rendering" job file (JSON render arguments) into
+the tiles folder and starts a runner:
+    python -m modules.generative_art.poster_queue <tiles_dir>
+Runners are detached from the web worker that started them (own session), so
+a worker being recycled or restarted doesn't kill a render. They take a lock
+on "<tiles_dir>/.poster.lock", so one render runs at a time, and drain the
+queue oldest first; extra runners just wait for the lock and find it empty.
+"""
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from modules.generative_art.tiled import render_tiled, remove_tiled_output
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+MARKER_EXT = ".rendering"
+LOCK_NAME = ".poster.lock"
+LOG_NAME = ".poster.log"
+
+# Jobs waiting or rendering at once; further requests are turned away
+MAX_QUEUED = int(os.environ.get("POSTER_MAX_QUEUED", "4"))
+
+log = logging.getLogger(__name__)
+
+
+class PosterQueueFull(RuntimeError):
+    pass
+
+
+def _marker_path(tiles_dir, name):
+    return os.path.join(tiles_dir, name + MARKER_EXT)
+
+
+def _write_marker(tiles_dir, name, job):
+    # Write + rename, so readers never see a half-written job
+    tmp = os.path.join(tiles_dir, f".{name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f)
+    os.replace(tmp, _marker_path(tiles_dir, name))
+
+
+def list_jobs(tiles_dir):
+    """[(name, job)] for every queued or running poster, oldest first."""
+    jobs = []
+    for f in os.listdir(tiles_dir):
+        if not f.endswith(MARKER_EXT):
+            continue
+        try:
+            with open(os.path.join(tiles_dir, f), encoding="utf-8") as fh:
+                job = json.load(fh)
+        except (OSError, ValueError):
+            # Finished since the listing
+            continue
+        jobs.append((f[:-len(MARKER_EXT)], job))
+    jobs.sort(key=lambda j: j[1].get("queued_at", 0))
+    return jobs
+
+
+@contextlib.contextmanager
+def _runner_lock(tiles_dir, blocking=True):
+    """Yields True while holding the runner lock (False if taken and not `blocking`)."""
+    fd = os.open(os.path.join(tiles_dir, LOCK_NAME), os.O_RDWR | os.O_CREAT)
+    try:
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                held = True
+                break
+            except OSError:
+                if not blocking:
+                    held = False
+                    break
+                time.sleep(1)
+        # The lock goes away with the descriptor (also when the process dies)
+        yield held
+    finally:
+        os.close(fd)
+
+
+def start_runner(tiles_dir):
+    """Start a detached runner process for `tiles_dir`."""
+    if os.name == "nt":
+        detach = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+    else:
+        detach = {"start_new_session": True}
+    with open(os.path.join(tiles_dir, LOG_NAME), "ab") as logf:
+        subprocess.Popen(
+            [sys.executable, "-m", "modules.generative_art.poster_queue", os.path.abspath(tiles_dir)],
+            cwd=PROJECT_ROOT,
+            env=dict(os.environ, MPLBACKEND="Agg"),
+            stdin=subprocess.DEVNULL,
+            stdout=logf,
+            stderr=logf,
+            **detach,
+        )
+
+
+def enqueue(tiles_dir, name, **render_kwargs):
+    """
+    Queue a render_tiled(**render_kwargs) job named `name` and make sure a
+    runner picks it up. Raises PosterQueueFull when MAX_QUEUED jobs are pending.
+    """
+    if len(list_jobs(tiles_dir)) >= MAX_QUEUED:
+        raise PosterQueueFull(f"{MAX_QUEUED} posters are already queued")
+    _write_marker(tiles_dir, name, {"state": "queued", "queued_at": time.time(), "kwargs": render_kwargs})
+    start_runner(tiles_dir)
+
+
+def _drop_dead_jobs(tiles_dir):
+    """With the lock held: "running" jobs belong to a runner that died."""
+    for name, job in list_jobs(tiles_dir):
+        if job.get("state") == "running":
+            remove_tiled_output(tiles_dir, name, job["kwargs"].get("tiff_path"))
+            with contextlib.suppress(OSError):
+                os.remove(_marker_path(tiles_dir, name))
+
+
+def check_queue(tiles_dir):
+    """
+    Clean up after crashed runners and restart the queue if nobody is
+    working on it. Cheap enough to call on every gallery view.
+    """
+    with _runner_lock(tiles_dir, blocking=False) as held:
+        if not held:
+            return
+        _drop_dead_jobs(tiles_dir)
+        pending = bool(list_jobs(tiles_dir))
+    if pending:
+        start_runner(tiles_dir)
+
+
+def run(tiles_dir):
+    """Render queued posters one at a time until the queue is empty."""
+    with _runner_lock(tiles_dir):
+        _drop_dead_jobs(tiles_dir)
+        while True:
+            jobs = list_jobs(tiles_dir)
+            if not jobs:
+                return
+            name, job = jobs[0]
+            # Re-stamped when the render actually starts, not when it was queued
+            job.update(state="running", started_at=time.time())
+            _write_marker(tiles_dir, name, job)
+            try:
+                render_tiled(out_dir=tiles_dir, name=name, **job["kwargs"])
+            except Exception:
+                # render_tiled already removed its partial output
+                log.exception("Poster render failed: %s", name)
+            finally:
+                with contextlib.suppress(OSError):
+                    os.remove(_marker_path(tiles_dir, name))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run(sys.argv[1])
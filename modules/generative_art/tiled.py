@@ -0,0 +1,262 @@
+"""
+Tiled "deep zoom" rendering for the generative artworks.
+
+Instead of one huge matplotlib canvas, the shape list is bucketed into a grid
+index and every tile of a pyramid is rendered on its own small canvas in a
+pool of worker processes, drawing only the shapes that touch that tile.
+
+Output layouts:
+  - "dzi": <name>.dzi + <name>_files/<level>/<col>_<row>.png (OpenSeadragon)
+  - "xyz": <name>_xyz/<z>/<x>/<y>.png (Leaflet / slippy-map style)
+Optionally the full-resolution image is also stitched into a memory-mapped
+TIFF (needs the `tifffile` package).
+"""
+import math
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from modules.generative_art.art1_geometric import build_storm_shapes
+from modules.generative_art.art2_oop_shapes import build_oop_shapes
+
+ART_BUILDERS = {
+    "storm": build_storm_shapes,
+    "oop": build_oop_shapes,
+}
+
+# Artworks are drawn in a 0..100 square
+WORLD_SIZE = 100.0
+
+# Line widths are tuned for the 7in @ 200dpi preview; scale them with the output
+REFERENCE_PX = 7 * 200
+REFERENCE_DPI = 200
+TILE_DPI = 100
+
+# World units added around each tile query so strokes/edges crossing a tile
+# border are not clipped away
+QUERY_MARGIN = 1.0
+
+LAYOUTS = ("dzi", "xyz")
+
+# Hard cap on render processes per render_tiled call (the poster queue runs
+# one call at a time)
+MAX_RENDER_WORKERS = int(os.environ.get("POSTER_RENDER_WORKERS", "2"))
+
+
+class GridIndex:
+    """Uniform-grid spatial index over shape bounding boxes."""
+
+    def __init__(self, shapes, cells=32, extent=WORLD_SIZE):
+        self.cells = cells
+        self.cell_size = extent / cells
+        self.buckets = {}
+        for i, shp in enumerate(shapes):
+            x0, y0, x1, y1 = shp.bbox()
+            for cx in range(self._cell(x0), self._cell(x1) + 1):
+                for cy in range(self._cell(y0), self._cell(y1) + 1):
+                    self.buckets.setdefault((cx, cy), []).append(i)
+
+    def _cell(self, v):
+        return min(self.cells - 1, max(0, int(v // self.cell_size)))
+
+    def query(self, x0, y0, x1, y1):
+        """Indices of shapes whose cell overlaps the box, in draw order."""
+        hits = set()
+        for cx in range(self._cell(x0), self._cell(x1) + 1):
+            for cy in range(self._cell(y0), self._cell(y1) + 1):
+                hits.update(self.buckets.get((cx, cy), ()))
+        return sorted(hits)
+
+
+# Per-process state, filled once by the pool initializer
+_WORKER = {}
+
+
+def _init_worker(shapes, background):
+    _WORKER["shapes"] = shapes
+    _WORKER["index"] = GridIndex(shapes)
+    _WORKER["background"] = background
+
+
+def _render_tile(job):
+    """
+    Render one tile of a `level_px` x `level_px` image.
+    Returns (job, rgb array) when the array is wanted for stitching.
+    """
+    level_px, col, row, tile_size, path, want_array = job
+    shapes = _WORKER["shapes"]
+    background = _WORKER["background"]
+
+    px0, py0 = col * tile_size, row * tile_size
+    w = min(tile_size, level_px - px0)
+    h = min(tile_size, level_px - py0)
+
+    # Pixel box -> world box (pixel rows grow downwards, world y grows upwards)
+    scale = WORLD_SIZE / level_px
+    x0, x1 = px0 * scale, (px0 + w) * scale
+    y1, y0 = WORLD_SIZE - py0 * scale, WORLD_SIZE - (py0 + h) * scale
+
+    hits = _WORKER["index"].query(x0 - QUERY_MARGIN, y0 - QUERY_MARGIN,
+                                  x1 + QUERY_MARGIN, y1 + QUERY_MARGIN)
+
+    if not hits:
+        # Nothing to draw: skip matplotlib entirely
+        img = Image.new("RGB", (w, h), background)
+        arr = np.asarray(img)
+    else:
+        fig = Figure(figsize=((w + 1e-3) / TILE_DPI, (h + 1e-3) / TILE_DPI), dpi=TILE_DPI)
+        fig.patch.set_facecolor(background)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_xlim(x0, x1)
+        ax.set_ylim(y0, y1)
+        ax.axis("off")
+
+        lw_scale = (level_px / REFERENCE_PX) * (REFERENCE_DPI / TILE_DPI)
+        for i in hits:
+            shapes[i].draw(ax, lw_scale=lw_scale)
+
+        canvas.draw()
+        arr = np.asarray(canvas.buffer_rgba())[:h, :w, :3]
+        img = Image.fromarray(arr)
+
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        img.save(path)
+
+    return job, (np.ascontiguousarray(arr) if want_array else None)
+
+
+def _pyramid_levels(size, tile_size, layout):
+    """[(level_id, level_px)] from the smallest level to the full-size one."""
+    if layout == "dzi":
+        max_level = int(math.ceil(math.log2(size))) if size > 1 else 0
+        return [(lv, int(math.ceil(size / 2 ** (max_level - lv)))) for lv in range(max_level + 1)]
+    max_zoom = max(0, int(math.ceil(math.log2(size / tile_size))))
+    return [(z, tile_size * 2 ** z) for z in range(max_zoom + 1)]
+
+
+def _tile_path(out_dir, name, layout, level, col, row):
+    if layout == "dzi":
+        return os.path.join(out_dir, f"{name}_files", str(level), f"{col}_{row}.png")
+    return os.path.join(out_dir, f"{name}_xyz", str(level), str(col), f"{row}.png")
+
+
+def _write_dzi(path, size, tile_size):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+            f'Format="png" Overlap="0" TileSize="{tile_size}">\n'
+            f'  <Size Width="{size}" Height="{size}"/>\n'
+            '</Image>\n'
+        )
+
+
+def _render_jobs(jobs, shapes, background, workers, size, tiff_path):
+    mosaic = None
+    if tiff_path is not None:
+        try:
+            import tifffile
+        except ImportError:
+            raise RuntimeError("Stitched TIFF output needs the 'tifffile' package (pip install tifffile).")
+        os.makedirs(os.path.dirname(os.path.abspath(tiff_path)), exist_ok=True)
+        mosaic = tifffile.memmap(tiff_path, shape=(size, size, 3), dtype=np.uint8,
+                                 photometric="rgb", bigtiff=True)
+
+    # spawn: render_tiled may be called from a web server's background thread,
+    # where forking a multi-threaded process is unsafe
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(shapes, background)) as pool:
+        for (level_px, col, row, ts, _, _), arr in pool.map(_render_tile, jobs, chunksize=16):
+            if arr is not None:
+                py, px = row * ts, col * ts
+                mosaic[py:py + arr.shape[0], px:px + arr.shape[1]] = arr
+
+    result = {}
+    if mosaic is not None:
+        mosaic.flush()
+        del mosaic
+        result["tiff"] = tiff_path
+    return result
+
+
+def remove_tiled_output(out_dir, name, tiff_path=None):
+    """Delete everything render_tiled may have written for `name`."""
+    for sub in (f"{name}_files", f"{name}_xyz"):
+        shutil.rmtree(os.path.join(out_dir, sub), ignore_errors=True)
+    for path in (os.path.join(out_dir, f"{name}.dzi"), tiff_path):
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def render_tiled(
+    art="storm",
+    n_shapes=250,
+    palette="sunset",
+    seed=None,
+    size=20000,
+    tile_size=256,
+    out_dir="static/generated/tiles",
+    name=None,
+    layout="dzi",
+    tiff_path=None,
+    workers=None,
+    background="#ffffff",
+):
+    """
+    Render an artwork as a tile pyramid of a `size` x `size` image.
+
+    Returns a dict with the output paths ("dzi" or "xyz_dir", and "tiff"
+    when requested), the number of levels and the number of tiles written.
+    """
+    if art not in ART_BUILDERS:
+        raise ValueError(f"unknown art: {art!r} (expected one of {sorted(ART_BUILDERS)})")
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout: {layout!r} (expected one of {LAYOUTS})")
+
+    shapes = ART_BUILDERS[art](n_shapes=n_shapes, palette=palette, seed=seed)
+    name = name or f"{art}_{size}"
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = []
+    levels = _pyramid_levels(size, tile_size, layout)
+    for level, level_px in levels:
+        n = int(math.ceil(level_px / tile_size))
+        stitch = tiff_path is not None and level_px == size
+        for col in range(n):
+            for row in range(n):
+                path = _tile_path(out_dir, name, layout, level, col, row)
+                jobs.append((level_px, col, row, tile_size, path, stitch))
+
+    # xyz levels are powers of two; render the exact-size image separately
+    if tiff_path is not None and all(px != size for _, px in levels):
+        n = int(math.ceil(size / tile_size))
+        jobs += [(size, col, row, tile_size, None, True) for col in range(n) for row in range(n)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, MAX_RENDER_WORKERS))
+
+    try:
+        result = _render_jobs(jobs, shapes, background, workers, size, tiff_path)
+    except BaseException:
+        # Don't leave a half-written pyramid / TIFF behind
+        remove_tiled_output(out_dir, name, tiff_path)
+        raise
+
+    result["levels"] = len(levels)
+    result["tiles"] = sum(1 for j in jobs if j[4])
+    # The .dzi is written last, so a listed poster is always complete
+    if layout == "dzi":
+        result["dzi"] = os.path.join(out_dir, f"{name}.dzi")
+        _write_dzi(result["dzi"], size, tile_size)
+    else:
+        result["xyz_dir"] = os.path.join(out_dir, f"{name}_xyz")
+
+    return result
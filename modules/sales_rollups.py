@@ -0,0 +1,268 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+VALUE_COLUMNS = ["RETAIL SALES", "WAREHOUSE SALES"]
+REQUIRED_COLUMNS = {"YEAR", "MONTH", *VALUE_COLUMNS}
+
+# Dataset columns the API can split series by
+GROUP_COLUMNS = ["SUPPLIER", "ITEM TYPE"]
+
+# Pandas resample rules for each resolution, coarsest last
+RESOLUTIONS = {"month": "MS", "quarter": "QS", "year": "YS"}
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+CSV_CHUNK_ROWS = 500_000
+
+# Bump when the table layout changes so stale on-disk caches are rebuilt
+ROLLUP_VERSION = 3
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def _rollup_cache_path(csv_path):
+    return csv_path + ".rollups.pkl"
+
+
+def _csv_stamp(csv_path):
+    st = os.stat(csv_path)
+    return (ROLLUP_VERSION, st.st_mtime_ns, st.st_size)
+
+
+def _read_chunks(csv_path):
+    wanted = REQUIRED_COLUMNS | set(GROUP_COLUMNS)
+    reader = pd.read_csv(
+        csv_path,
+        usecols=lambda c: c.strip().upper() in wanted,
+        chunksize=CSV_CHUNK_ROWS,
+    )
+    for chunk in reader:
+        # Normalize column names to reduce CSV mismatch issues
+        chunk.columns = [c.strip().upper() for c in chunk.columns]
+        yield chunk
+
+
+def build_rollups(csv_path):
+    """
+    One streaming pass over the CSV -> pre-aggregated tables.
+
+    Returns {(group_column or None, resolution): DataFrame} where each
+    DataFrame is indexed by DATE and holds the combined sales value (one
+    column "VALUE" for the overall series, one column per group otherwise).
+    """
+    partial_total = []
+    partial_groups = {col: [] for col in GROUP_COLUMNS}
+    group_cols = None
+
+    for chunk in _read_chunks(csv_path):
+        missing = REQUIRED_COLUMNS - set(chunk.columns)
+        if missing:
+            raise ValueError(f"CSV is missing columns: {sorted(list(missing))}")
+        if group_cols is None:
+            group_cols = [c for c in GROUP_COLUMNS if c in chunk.columns]
+
+        chunk["MONTH"] = chunk["MONTH"].astype(str).str.zfill(2)
+        chunk["DATE"] = pd.to_datetime(chunk["YEAR"].astype(str) + "-" + chunk["MONTH"] + "-01", errors="coerce")
+        chunk = chunk.dropna(subset=["DATE"])
+        chunk["VALUE"] = chunk[VALUE_COLUMNS].fillna(0).sum(axis=1)
+
+        partial_total.append(chunk.groupby("DATE")["VALUE"].sum())
+        for col in group_cols:
+            partial_groups[col].append(
+                chunk.fillna({col: "UNKNOWN"}).groupby(["DATE", col])["VALUE"].sum()
+            )
+
+    tables = {}
+    if not partial_total:
+        return tables
+
+    # Periods without any rows are left out at every resolution (not zero-filled),
+    # matching the original month-only series
+    monthly = pd.concat(partial_total).groupby(level=0).sum().sort_index().to_frame("VALUE")
+    for res, rule in RESOLUTIONS.items():
+        tables[(None, res)] = _resample_sparse(monthly, rule)
+
+    for col in group_cols or []:
+        wide = (
+            pd.concat(partial_groups[col])
+            .groupby(level=[0, 1]).sum()
+            .unstack(fill_value=0)
+            .sort_index()
+        )
+        # Largest groups first, so "top N" is a column slice
+        wide = wide[wide.sum().sort_values(ascending=False).index]
+        for res, rule in RESOLUTIONS.items():
+            tables[(col, res)] = _resample_sparse(wide, rule)
+
+    return tables
+
+
+def _resample_sparse(df, rule):
+    """Sum into `rule` periods, dropping periods that had no monthly rows."""
+    return df.resample(rule).sum(min_count=1).dropna(how="all")
+
+
+def get_rollups(csv_path):
+    """
+    Rollup tables for a CSV, rebuilt only when the file changes.
+    Kept in memory per process and pickled next to the CSV so other
+    workers / restarts can skip the CSV pass.
+    """
+    stamp = _csv_stamp(csv_path)
+    with _lock:
+        hit = _cache.get(csv_path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+
+        pkl = _rollup_cache_path(csv_path)
+        tables = None
+        if os.path.exists(pkl):
+            try:
+                saved_stamp, saved = pd.read_pickle(pkl)
+                if saved_stamp == stamp:
+                    tables = saved
+            except Exception:
+                tables = None
+
+        if tables is None:
+            tables = build_rollups(csv_path)
+            tmp = f"{pkl}.{os.getpid()}.tmp"
+            try:
+                pd.to_pickle((stamp, tables), tmp)
+                os.replace(tmp, pkl)
+            except OSError:
+                pass
+
+        _cache[csv_path] = (stamp, tables)
+        return tables
+
+
+def lttb_indices(y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points keeping the shape of y."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    y = np.asarray(y, dtype=float)
+    x = np.arange(n, dtype=float)
+    every = (n - 2) / (n_out - 2)
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # Average point of the next bucket (the last point for the final one)
+        nhi = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[hi:nhi].mean(), y[hi:nhi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out):
+    """Min and max of each bucket (n_out // 2 buckets), in time order."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    buckets = max(1, n_out // 2)
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    idx = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = y[lo:hi]
+        idx.extend({lo + int(np.argmin(seg)), lo + int(np.argmax(seg))})
+    return np.array(sorted(set(idx)), dtype=int)
+
+
+def _parse_date(value, name, end=False):
+    """
+    Start of the period `value` names, or its end when `end` is set, so
+    end=2019 covers all of 2019 and end=2019-06 all of June.
+    """
+    if not value:
+        return None
+    try:
+        period = pd.Period(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} date: {value!r} (expected YYYY-MM)")
+    return period.end_time if end else period.start_time
+
+
+def query_series(
+    csv_path,
+    start=None,
+    end=None,
+    points=None,
+    method="lttb",
+    group_by=None,
+    top=5,
+    resolution="month",
+):
+    """
+    Answer a sales-series query from the rollup tables.
+
+    Returns {"labels", "values", "norm"} for the overall series, plus
+    "series" (one entry per group: name + values) when `group_by` is set.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution!r} (expected one of {list(RESOLUTIONS)})")
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method: {method!r} (expected one of {list(DOWNSAMPLE_METHODS)})")
+    if points is not None and points < 2:
+        raise ValueError(f"points must be at least 2 (got {points})")
+    if top < 1:
+        raise ValueError(f"top must be at least 1 (got {top})")
+    if group_by is not None:
+        group_by = group_by.strip().upper().replace("_", " ")
+        if group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by {group_by!r} (expected one of {GROUP_COLUMNS})")
+
+    tables = get_rollups(csv_path)
+    if not tables:
+        return {"labels": [], "values": [], "norm": []}
+    if group_by is not None and (group_by, resolution) not in tables:
+        raise ValueError(f"CSV has no {group_by!r} column")
+
+    start_ts, end_ts = _parse_date(start, "start"), _parse_date(end, "end", end=True)
+    total = tables[(None, resolution)]["VALUE"].loc[start_ts:end_ts]
+
+    values = total.to_numpy(dtype=float)
+    if points and points < len(values):
+        pick = lttb_indices(values, points) if method == "lttb" else minmax_indices(values, points)
+    else:
+        pick = np.arange(len(values))
+
+    values = values[pick]
+    labels = total.index[pick].strftime("%Y-%m").tolist()
+
+    if len(values) == 0:
+        result = {"labels": [], "values": [], "norm": []}
+    else:
+        mn, mx = values.min(), values.max()
+        norm = (values - mn) / (mx - mn) if mx != mn else np.full_like(values, 0.5)
+        result = {"labels": labels, "values": values.tolist(), "norm": norm.tolist()}
+
+    if group_by is not None:
+        wide = tables[(group_by, resolution)].loc[start_ts:end_ts]
+        # Rank groups by their sales inside the requested range; groups with
+        # no sales there (or an empty range) are left out
+        sums = wide.sum()
+        names = sums[sums != 0].sort_values(ascending=False).index[:top]
+        sub = wide[names].to_numpy(dtype=float)[pick]
+        result["series"] = [
+            {"name": str(name), "values": sub[:, i].tolist()} for i, name in enumerate(names)
+        ]
+
+    return result
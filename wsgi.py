@@ -0,0 +1,65 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the import below (and the warmup) runs once in the gunicorn
+master; workers are forked afterwards and share the warmed-up state.
+"""
+import os
+import tempfile
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+from PIL import Image
+
+from app import app, SALES_CSV
+from modules.image_tool import apply_edit
+from modules.data_visualization import generate_sales_wave_art
+from modules.generative_art.art1_geometric import generate_geometric_storm
+from modules.generative_art.art2_oop_shapes import generate_oop_art
+from modules.audio_tool import generate_ambient, change_speed_file, pitch_shift_file
+from modules.sales_rollups import get_rollups
+from modules.audio_decode import STATS
+
+
+def warmup():
+    """
+    Run every generator once on tiny inputs so the first real request
+    doesn't pay for imports, font caches, librosa JIT or the rollup build.
+    Failures are logged and skipped (e.g. no CSV on this host).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        png = os.path.join(tmp, "warm.png")
+        wav = os.path.join(tmp, "warm.wav")
+
+        steps = [
+            ("geometric storm", lambda: generate_geometric_storm(n_shapes=20, seed=0, save_path=png)),
+            ("oop art", lambda: generate_oop_art(n_shapes=20, seed=0, save_path=png)),
+            ("sales rollups", lambda: get_rollups(SALES_CSV)),
+            ("sales wave art", lambda: generate_sales_wave_art(csv_path=SALES_CSV, save_path=png)),
+            ("image edit", lambda: (
+                Image.fromarray(np.zeros((32, 32, 3), dtype=np.uint8)).save(png),
+                apply_edit(png, png, effect="blur", rotate_deg=90, resize_w=16, resize_h=16),
+            )),
+            ("ambient", lambda: generate_ambient(wav, seconds=1)),
+            ("speed", lambda: (
+                change_speed_file(wav, os.path.join(tmp, "v.wav"), 1.25, mode="varispeed"),
+                change_speed_file(wav, os.path.join(tmp, "s.wav"), 1.25, mode="stretch"),
+            )),
+            ("pitch", lambda: pitch_shift_file(wav, os.path.join(tmp, "p.wav"), 2)),
+        ]
+
+        for name, step in steps:
+            try:
+                step()
+                app.logger.info("warmup: %s ok", name)
+            except Exception as e:
+                app.logger.warning("warmup: %s skipped (%s)", name, e)
+
+    # Warmup decodes are not traffic; don't let every forked worker inherit them
+    STATS.reset()
+
+
+if os.environ.get("SKIP_WARMUP") != "1":
+    warmup()